@@ -1,113 +1,163 @@
 import random
-from enum import Enum, auto
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
-class CardType(Enum):
-    """
-    Enumeration of all card types in Flip7.
-    """
-    NUMBER = auto()
-    FLIP_THREE = auto()
-    FREEZE = auto()
-    SECOND_CHANCE = auto()
-    ADDITIVE = auto()
-    MULTIPLIER = auto()
-
-class Card:
-    """
-    Abstract base class for cards in Flip7.
-    """
-    def __init__(self, card_type: CardType):
-        self.card_type = card_type
+# Card type tags
+CT_NUMBER, CT_FLIP_THREE, CT_FREEZE, CT_SECOND_CHANCE, CT_ADDITIVE, CT_MULTIPLIER = range(6)
+CARD_TYPE_NAMES = ('NUMBER', 'FLIP_THREE', 'FREEZE', 'SECOND_CHANCE', 'ADDITIVE', 'MULTIPLIER')
 
-class NumberCard(Card):
-    """
-    Represents a numbered card with a specific integer value.
-    """
-    def __init__(self, value: int):
-        super().__init__(CardType.NUMBER)
-        self.value = value
+# A card is a single byte: the high nibble is its card type tag and the low
+# nibble its value (number cards) or amount (modifier cards).
+def make_card(card_type: int, value: int = 0) -> int:
+    """Encode a card as its tagged byte code."""
+    return (card_type << 4) | value
 
-    def __repr__(self):
-        return f"Number({self.value})"
+def card_type(code: int) -> int:
+    """Type tag (CT_*) of a card code."""
+    return code >> 4
 
-class ActionCard(Card):
-    """
-    Represents an action card (Flip Three, Freeze, or Second Chance).
-    """
-    def __init__(self, action_type: CardType):
-        if action_type not in (CardType.FLIP_THREE, CardType.FREEZE, CardType.SECOND_CHANCE):
-            raise ValueError("Invalid action card type")
-        super().__init__(action_type)
+def card_value(code: int) -> int:
+    """Value or amount of a card code."""
+    return code & 0xF
 
-    def __repr__(self):
-        return f"Action({self.card_type.name})"
+def _card_name(code: int) -> str:
+    t = code >> 4
+    if t == CT_NUMBER:
+        return f"Number({code & 0xF})"
+    if t >= CT_ADDITIVE:
+        return f"Modifier({CARD_TYPE_NAMES[t]},{code & 0xF})"
+    return f"Action({CARD_TYPE_NAMES[t]})"
 
-class ModifierCard(Card):
-    """
-    Represents a modifier card that either adds to or multiplies the total.
-    """
-    def __init__(self, modifier_type: CardType, amount: int):
-        if modifier_type not in (CardType.ADDITIVE, CardType.MULTIPLIER):
-            raise ValueError("Invalid modifier card type")
-        super().__init__(modifier_type)
-        self.amount = amount
+# Number cards carry tag 0, so their code is their value
+FLIP_THREE_CODE = make_card(CT_FLIP_THREE)
+FREEZE_CODE = make_card(CT_FREEZE)
+SECOND_CHANCE_CODE = make_card(CT_SECOND_CHANCE)
+
+# Player actions, encoded as small ints
+ACTION_HIT = 0
+ACTION_STAY = 1
+ACTION_KEEP_FLIP_THREE = 2
+ACTION_PASS_FLIP_THREE = 3
+ACTION_KEEP_FREEZE = 4
+ACTION_PASS_FREEZE = 5
+ACTION_NAMES = ('Hit', 'Stay', 'KeepFlipThree', 'PassFlipThree', 'KeepFreeze', 'PassFreeze')
+
+_FLIP_THREE_ACTIONS = (ACTION_KEEP_FLIP_THREE, ACTION_PASS_FLIP_THREE)
+_FREEZE_ACTIONS = (ACTION_KEEP_FREEZE, ACTION_PASS_FREEZE)
+
+# get_actions returns a bitmap with bit ``1 << action`` set for each legal action
+ACTIONS_NONE = 0
+ACTIONS_HIT_ONLY = 1 << ACTION_HIT
+ACTIONS_HIT_STAY = 1 << ACTION_HIT | 1 << ACTION_STAY
+ACTIONS_FLIP_THREE = 1 << ACTION_KEEP_FLIP_THREE | 1 << ACTION_PASS_FLIP_THREE
+ACTIONS_FREEZE = 1 << ACTION_KEEP_FREEZE | 1 << ACTION_PASS_FREEZE
+
+def actions_from_mask(mask: int) -> Tuple[int, ...]:
+    """Legal actions listed in a get_actions bitmap."""
+    return tuple(a for a in range(len(ACTION_NAMES)) if mask >> a & 1)
+
+def _build_deck_template() -> bytes:
+    codes: List[int] = []
+    counts = {i: i if i > 0 else 1 for i in range(13)}
+    for value, cnt in counts.items():
+        codes.extend([value] * cnt)
+    codes.extend([FLIP_THREE_CODE] * 4)
+    codes.extend([FREEZE_CODE] * 4)
+    codes.extend([SECOND_CHANCE_CODE] * 4)
+    for add in [2,4,6,8,10]:
+        codes.append(make_card(CT_ADDITIVE, add))
+    codes.extend([make_card(CT_MULTIPLIER, 2)] * 2)
+    return bytes(codes)
+
+_DECK_TEMPLATE: bytes = _build_deck_template()
+
+# Display names are decoded once per distinct card; only verbose output needs them
+_CARD_NAMES: Dict[int, str] = {code: _card_name(code) for code in set(_DECK_TEMPLATE)}
+
+def format_card(code: int) -> str:
+    """Readable form of a card code."""
+    name = _CARD_NAMES.get(code)
+    return name if name is not None else _card_name(code)
+
+def _build_bits_tables() -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    # Each mask extends the mask without its lowest set bit by one value,
+    # so both tables fill in a single pass at import time.
+    sums = [0] * (1 << 13)
+    pops = [0] * (1 << 13)
+    for m in range(1, 1 << 13):
+        rest = m & (m - 1)
+        sums[m] = sums[rest] + (m ^ rest).bit_length() - 1
+        pops[m] = pops[rest] + 1
+    return tuple(sums), tuple(pops)
 
-    def __repr__(self):
-        return f"Modifier({self.card_type.name},{self.amount})"
+# Lookup tables over every 13-bit flipped mask: sum of the values set, and how many are set
+_BITS_SUM, _BITS_POP = _build_bits_tables()
 
 class Deck:
     """
-    Manages the draw and discard piles, auto-reshuffling when needed.
+    Manages the draw pile as a byte buffer of card codes, recycling the discard pile when needed.
+
+    Cards below ``top`` are still to be drawn; cards from ``top`` upwards form the discard pile.
+    Each draw picks uniformly among the cards below ``top`` (an incremental Fisher-Yates
+    shuffle), so the buffer never needs shuffling up front. Resets restore the template
+    order so that a seeded game does not depend on the previous game's draws.
     """
-    def __init__(self):
-        self.cards: List[Card] = []
-        self.discard: List[Card] = []
-        counts = {i: i if i > 0 else 1 for i in range(13)}
-        for value, cnt in counts.items():
-            self.cards.extend(NumberCard(value) for _ in range(cnt))
-        self.cards.extend(ActionCard(CardType.FLIP_THREE) for _ in range(4))
-        self.cards.extend(ActionCard(CardType.FREEZE) for _ in range(4))
-        self.cards.extend(ActionCard(CardType.SECOND_CHANCE) for _ in range(4))
-        for add in [2,4,6,8,10]:
-            self.cards.append(ModifierCard(CardType.ADDITIVE, add))
-        self.cards.extend(ModifierCard(CardType.MULTIPLIER, 2) for _ in range(2))
-        self.shuffle()
-
-    def shuffle(self):
-        """Shuffle draw pile."""
-        random.shuffle(self.cards)
-
-    def draw(self) -> Card:
-        """Draw a card, auto-reshuffling if needed."""
-        if not self.cards:
-            if self.discard:
-                self.cards, self.discard = self.discard, []
-                self.shuffle()
-            else:
-                raise IndexError("Empty deck and discard")
-        card = self.cards.pop()
-        self.discard.append(card)
-        return card
+    __slots__ = ('rng', 'cards', 'top')
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+        self.cards = bytearray(_DECK_TEMPLATE)
+        self.top: int = len(self.cards)
+
+    def reset(self):
+        """Return every card to the draw pile, restoring the template order."""
+        self.cards[:] = _DECK_TEMPLATE
+        self.top = len(self.cards)
+
+    def draw(self) -> int:
+        """Draw a random card code, recycling the discard pile if the draw pile is empty."""
+        top = self.top or len(self.cards)
+        j = int(self.rng.random() * top)
+        top -= 1
+        cards = self.cards
+        code = cards[j]; cards[j] = cards[top]; cards[top] = code
+        self.top = top
+        return code
 
 class PlayerState:
     """
     Tracks a player's round-specific state.
     """
+    __slots__ = ('has_second_chance', 'pending_flips', 'active', 'need_flip_decision',
+                 'need_freeze_decision', 'busted', 'flipped_bits', 'add_total', 'mul_total')
+
     def __init__(self):
-        self.flipped: List[NumberCard] = []
-        self.modifiers: List[ModifierCard] = []
         self.has_second_chance: bool = False
         self.pending_flips: int = 0
         self.active: bool = True
         self.need_flip_decision: bool = False
         self.need_freeze_decision: bool = False
         self.busted: bool = False
+        # Cards held this round, reduced to plain ints so resets never allocate
+        self.flipped_bits: int = 0  # bit v set once a number v is flipped
+        self.add_total: int = 0
+        self.mul_total: int = 1
+
+    def add_number(self, value: int):
+        """Record a newly flipped number card."""
+        self.flipped_bits |= 1 << value
+
+    def add_modifier(self, code: int):
+        """Record a modifier card code."""
+        if code>>4==CT_MULTIPLIER:
+            self.mul_total *= code & 0xF
+        else:
+            self.add_total += code & 0xF
 
     def reset_round(self):
         """Reset round state."""
-        self.flipped.clear()
-        self.modifiers.clear()
+        self.add_total = 0
+        self.mul_total = 1
+        self.flipped_bits = 0
         self.has_second_chance = False
         self.pending_flips = 0
         self.active = True
@@ -119,116 +169,166 @@ class GameState:
     """
     Main game environment for Flip7.
     """
-    def __init__(self):
-        self.deck = Deck()
+    __slots__ = ('deck', 'players', 'current', 'round_active', 'n_active', 'cumulative')
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.deck = Deck(rng)
         self.players: List[PlayerState] = [PlayerState(), PlayerState()]
         self.current: int = 0
         self.round_active: bool = True
+        self.n_active: int = 2  # players still active this round
         self.cumulative: List[int] = [0,0]
 
-    def get_actions(self) -> List[str]:
+    def reset_game(self):
+        """Start a new game: scores cleared and player 1 to act."""
+        self.cumulative = [0,0]
+        self.current = 0
+
+    def reset_round(self):
+        """Start a new round: fresh deck and player states, scores kept."""
+        self.deck.reset()
+        for p in self.players:
+            p.reset_round()
+        self.round_active = True
+        self.n_active = 2
+
+    def get_actions(self) -> int:
+        """Bitmap of the current player's legal actions (see ACTIONS_*)."""
         ps = self.players[self.current]
         if not ps.active or not self.round_active:
-            return []
+            return ACTIONS_NONE
         if ps.need_flip_decision:
-            return ['KeepFlipThree','PassFlipThree']
+            return ACTIONS_FLIP_THREE
         if ps.need_freeze_decision:
-            return ['KeepFreeze','PassFreeze']
+            return ACTIONS_FREEZE
         if ps.pending_flips>0:
-            return ['Hit']
-        return ['Hit','Stay']
+            return ACTIONS_HIT_ONLY
+        return ACTIONS_HIT_STAY
 
     def compute_round_score(self, player: PlayerState) -> int:
         if player.busted:
             return 0
-        total = sum(c.value for c in player.flipped)
-        for m in player.modifiers:
-            if m.card_type==CardType.MULTIPLIER:
-                total*=m.amount
-        for m in player.modifiers:
-            if m.card_type==CardType.ADDITIVE:
-                total+=m.amount
-        if len({c.value for c in player.flipped})>=7:
-            total+=15
-        return total
-
-    def step(self, action: str) -> Optional[Card]:
-        ps = self.players[self.current]
-        other = self.players[1-self.current]
+        bits = player.flipped_bits
+        bonus = 15 if _BITS_POP[bits]>=7 else 0
+        return _BITS_SUM[bits]*player.mul_total + player.add_total + bonus
+
+    def step(self, action: int) -> Optional[int]:
+        cur = self.current
+        oth = cur ^ 1
+        players = self.players
+        ps = players[cur]
+        other = players[oth]
         # Flip-three decision must be immediate, no turn toggle before decision.
-        if ps.need_flip_decision and action in ('KeepFlipThree','PassFlipThree'):
-            if action=='KeepFlipThree':
+        if ps.need_flip_decision and action in _FLIP_THREE_ACTIONS:
+            if action==ACTION_KEEP_FLIP_THREE:
                 ps.pending_flips+=3
                 # current remains
             else:
                 other.pending_flips+=3
-                self.current=1-self.current
+                self.current=oth
             ps.need_flip_decision=False
             return None
         # Freeze decision similarly immediate
-        if ps.need_freeze_decision and action in ('KeepFreeze','PassFreeze'):
-            if action=='KeepFreeze':
+        if ps.need_freeze_decision and action in _FREEZE_ACTIONS:
+            if action==ACTION_KEEP_FREEZE:
                 pts=self.compute_round_score(ps)
-                self.cumulative[self.current]+=pts
+                self.cumulative[cur]+=pts
                 ps.active=False
             else:
                 pts=self.compute_round_score(other)
-                self.cumulative[1-self.current]+=pts
+                self.cumulative[oth]+=pts
                 other.active=False
+            self.n_active-=1
             ps.need_freeze_decision=False
-            if any(p.active for p in self.players):
-                self.current^=1
+            if self.n_active:
+                self.current=oth
             else:
                 self.round_active=False
             return None
         if not ps.active or not self.round_active:
             return None
-        if action=='Stay':
+        if action==ACTION_STAY:
             pts=self.compute_round_score(ps)
-            self.cumulative[self.current]+=pts
-            ps.active=False
-            if any(p.active for p in self.players): self.current^=1
+            self.cumulative[cur]+=pts
+            ps.active=False; self.n_active-=1
+            if self.n_active: self.current=oth
             else: self.round_active=False
             return None
-        if action=='Hit':
+        if action==ACTION_HIT:
             if ps.pending_flips>0: ps.pending_flips-=1
-            card=self.deck.draw()
-            if isinstance(card,NumberCard):
-                if any(c.value==card.value for c in ps.flipped):
+            deck=self.deck; top=deck.top
+            if top:
+                # inlined Deck.draw pick-and-swap; it is only called to recycle an exhausted pile
+                j=int(deck.rng.random()*top); top-=1; cards=deck.cards
+                code=cards[j]; cards[j]=cards[top]; cards[top]=code
+                deck.top=top
+            else:
+                code=deck.draw()
+            if code<FLIP_THREE_CODE:
+                bit=1<<code
+                if ps.flipped_bits & bit:
                     if not ps.has_second_chance:
-                        ps.active=False; ps.busted=True
+                        ps.active=False; ps.busted=True; self.n_active-=1
                     else:
                         ps.has_second_chance=False
                 else:
-                    ps.flipped.append(card)
-            elif isinstance(card,ActionCard):
-                if card.card_type==CardType.FLIP_THREE:
-                    if other.active: ps.need_flip_decision=True
-                    else : ps.pending_flips+=3
-                elif card.card_type==CardType.FREEZE:
-                    if other.active: ps.need_freeze_decision=True
-                    else:
-                        pts=self.compute_round_score(ps)
-                        self.cumulative[self.current]+=pts; ps.active=False
-                else: ps.has_second_chance=True
+                    ps.flipped_bits|=bit
+            elif code==FLIP_THREE_CODE:
+                if other.active: ps.need_flip_decision=True
+                else : ps.pending_flips+=3
+            elif code==FREEZE_CODE:
+                if other.active: ps.need_freeze_decision=True
+                else:
+                    pts=self.compute_round_score(ps)
+                    self.cumulative[cur]+=pts; ps.active=False; self.n_active-=1
+            elif code==SECOND_CHANCE_CODE: ps.has_second_chance=True
             else:
-                ps.modifiers.append(card)
+                ps.add_modifier(code)
             # toggle after draw except if flip3 decision pending
             if not ps.need_flip_decision and not ps.need_freeze_decision and ps.pending_flips == 0:
-                self.current^=1
-            if not any(p.active for p in self.players): self.round_active=False
-            return card
+                self.current=oth
+            if not self.n_active: self.round_active=False
+            return code
         return None
 
 # --- Tests ----------------------------------------------
 def _run_tests():
     gs=GameState()
-    p=PlayerState(); p.flipped=[NumberCard(5),NumberCard(6)]; p.modifiers=[ModifierCard(CardType.MULTIPLIER,2),ModifierCard(CardType.ADDITIVE,3)]
+    p=PlayerState(); p.add_number(5); p.add_number(6); p.add_modifier(make_card(CT_MULTIPLIER,2)); p.add_modifier(make_card(CT_ADDITIVE,3))
     assert gs.compute_round_score(p)==25
-    p2=PlayerState(); p2.flipped=[NumberCard(7)]; p2.busted=True
+    p.reset_round(); assert gs.compute_round_score(p)==0
+    p2=PlayerState(); p2.add_number(7); p2.busted=True
     assert gs.compute_round_score(p2)==0
-    p3=PlayerState(); p3.flipped=[NumberCard(i) for i in range(7)]
-    assert gs.compute_round_score(p3)==sum(range(7))+15
+    p3=PlayerState()
+    for i in range(7): p3.add_number(i)
+    assert gs.compute_round_score(p3)==sum(range(7))+15 and p3.flipped_bits==0b1111111
+    assert format_card(7)=="Number(7)" and format_card(FREEZE_CODE)=="Action(FREEZE)"
+    assert format_card(make_card(CT_ADDITIVE,3))=="Modifier(ADDITIVE,3)"
+    assert card_type(make_card(CT_ADDITIVE,8))==CT_ADDITIVE and card_value(make_card(CT_ADDITIVE,8))==8
+    assert _BITS_SUM[0b1000000000101]==12+2 and _BITS_POP[0b1000000000101]==3
+    assert all(_BITS_SUM[m]==sum(v for v in range(13) if m>>v & 1) and _BITS_POP[m]==bin(m).count('1') for m in range(1<<13))
+    d1,d2=Deck(random.Random(7)),Deck(random.Random(7))
+    assert [d1.draw() for _ in range(20)]==[d2.draw() for _ in range(20)]
+    assert gs.get_actions()==ACTIONS_HIT_STAY and actions_from_mask(ACTIONS_FREEZE)==_FREEZE_ACTIONS
+    gs.step(ACTION_STAY); assert gs.n_active==1 and gs.current==1
+    gs.step(ACTION_STAY); assert gs.n_active==0 and not gs.round_active
+    gs.reset_round(); assert gs.n_active==2 and gs.round_active and all(p.active for p in gs.players)
+    def play_seeded(g: GameState, seed: int) -> List[int]:
+        g.reset_game(); g.deck.rng.seed(seed); rng=g.deck.rng
+        for _ in range(5):
+            g.reset_round()
+            while g.round_active:
+                mask=g.get_actions()
+                if not mask: g.current^=1; continue
+                g.step(ACTION_HIT if mask & ACTIONS_HIT_ONLY and rng.random()<0.8 else actions_from_mask(mask)[-1])
+        return g.cumulative
+    reused=GameState(); play_seeded(reused, 1)
+    assert play_seeded(reused, 9)==play_seeded(GameState(), 9)
+    d=Deck(); drawn=sorted(d.draw() for _ in range(len(_DECK_TEMPLATE)))
+    assert bytes(drawn)==bytes(sorted(_DECK_TEMPLATE)) and d.top==0
+    d.draw(); assert d.top==len(_DECK_TEMPLATE)-1
+    buf=d.cards; d.reset(); assert d.cards is buf and d.top==len(_DECK_TEMPLATE)
+    assert d.cards==_DECK_TEMPLATE
     print("All tests passed!")
 
 if __name__=='__main__':
@@ -1,78 +1,158 @@
+import os
 import random
-from game_functions import GameState, NumberCard, ModifierCard, CardType
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+from game_functions import (GameState, format_card, actions_from_mask, ACTION_HIT, ACTION_STAY,
+                            ACTION_NAMES, ACTIONS_HIT_STAY, ACTIONS_HIT_ONLY)
 
 # Simulation runner for Flip7 GameState
 
-def run_simulation(target_score=100, bias_hit=0.9):
+def run_simulation(target_score=100, bias_hit=0.9, verbose=False, record_history=False, seed=None):
     """
     Run a full game simulation until one player reaches target_score.
 
+    See play_game for the arguments; this returns only the history.
+    """
+    return play_game(target_score, bias_hit, verbose, record_history, seed=seed)[1]
+
+def play_game(target_score=100, bias_hit=0.9, verbose=False, record_history=False, rng: Optional[random.Random] = None, seed=None, gs: Optional[GameState] = None) -> Tuple[GameState, list]:
+    """
+    Play one game until a player reaches target_score.
+
     Args:
         target_score (int): Score threshold to end the game.
         bias_hit (float): Probability of choosing 'Hit' over 'Stay' when both are available.
+        verbose (bool): Print a summary of every round and the final result (implies record_history).
+        record_history (bool): Collect per-round actions, hits, cards and points.
+        rng (random.Random): Generator for shuffles and policy choices of a new GameState.
+        seed (int): If given, reseeds the game's generator before play.
+        gs (GameState): Existing game to reuse, reset to a new game; its deck's
+            generator is used and rng is ignored.
+
+    Returns:
+        tuple: The finished GameState and the per-round history dicts
+        (empty unless history is recorded).
     """
-    gs = GameState()
+    record_history = record_history or verbose
+    if gs is None:
+        gs = GameState(rng)
+    else:
+        gs.reset_game()
+    rng = gs.deck.rng
+    if seed is not None:
+        rng.seed(seed)
+    # Bind hot-loop methods once so each turn skips the attribute lookups
+    get_actions = gs.get_actions
+    step = gs.step
+    rand = rng.random
+    choice = rng.choice
     history = []
     round_number = 1
 
     while max(gs.cumulative) < target_score:
         # Start a new round
-        gs.round_active = True
-        gs.deck = gs.deck.__class__()  # reset deck by creating a new instance
-        for p in gs.players:
-            p.reset_round()
-
-        round_hist = {
-            'actions': [],
-            'hits': [0, 0],
-            'cards': [[], []],
-            'score': [0, 0]
-        }
+        gs.reset_round()
+
+        if record_history:
+            round_hist = {
+                'actions': [],
+                'hits': [0, 0],
+                'cards': [[], []],
+                'score': [0, 0]
+            }
 
         # Play the round
         while gs.round_active:
             current = gs.current
-            actions = gs.get_actions()
+            actions = get_actions()
             if not actions:
                 gs.current ^= 1
                 continue
             # bias towards Hit
-            if 'Hit' in actions and 'Stay' in actions:
-                weights = [bias_hit if a == 'Hit' else 1 - bias_hit for a in actions]
-                action = random.choices(actions, weights)[0]
+            if actions == ACTIONS_HIT_STAY:
+                action = ACTION_HIT if rand() < bias_hit else ACTION_STAY
+            elif actions == ACTIONS_HIT_ONLY:
+                action = ACTION_HIT
             else:
-                action = random.choice(actions)
-
-            round_hist['actions'].append(f"P{current+1}:{action}")
-            if action == 'Hit':
-                round_hist['hits'][current] += 1
-
-            card = gs.step(action)
-            if action == 'Hit' and card is not None:
-                round_hist['cards'][current].append(card)
-
-        # End of round: compute scores and update cumulative
-        for i, p in enumerate(gs.players):
-            pts = gs.compute_round_score(p)
-            round_hist['score'][i] = pts
-            
-
-        # Print round summary
-        print(f"Round {round_number} Summary:")
-        print(f"  Actions: {round_hist['actions']}")
-        for i in range(2):
-            print(f"  Player {i+1}: Hits={round_hist['hits'][i]}, Cards={round_hist['cards'][i]}, Points={round_hist['score'][i]}")
-        print(f"  Cumulative Scores: {gs.cumulative}\n")
-
-        history.append(round_hist)
+                action = choice(actions_from_mask(actions))
+
+            card = step(action)
+            if record_history:
+                # (player, action) pairs; formatted only when printed
+                round_hist['actions'].append((current, action))
+                if action == ACTION_HIT:
+                    round_hist['hits'][current] += 1
+                    if card is not None:
+                        round_hist['cards'][current].append(card)
+
+        if record_history:
+            # End of round: record round scores (cumulative is updated by step)
+            for i, p in enumerate(gs.players):
+                round_hist['score'][i] = gs.compute_round_score(p)
+            history.append(round_hist)
+
+        if verbose:
+            # Print round summary
+            print(f"Round {round_number} Summary:")
+            print(f"  Actions: {[f'P{p+1}:{ACTION_NAMES[a]}' for p, a in round_hist['actions']]}")
+            for i in range(2):
+                print(f"  Player {i+1}: Hits={round_hist['hits'][i]}, Cards=[{', '.join(format_card(c) for c in round_hist['cards'][i])}], Points={round_hist['score'][i]}")
+            print(f"  Cumulative Scores: {gs.cumulative}\n")
+
         round_number += 1
 
     # Final result
-    winner = 1 if gs.cumulative[0] < gs.cumulative[1] else 0
-    print(f"Game over! Final Scores: Player1={gs.cumulative[0]}, Player2={gs.cumulative[1]}")
-    print(f"Winner: Player {winner+1}")
-    return history
+    if verbose:
+        winner = 1 if gs.cumulative[0] < gs.cumulative[1] else 0
+        print(f"Game over! Final Scores: Player1={gs.cumulative[0]}, Player2={gs.cumulative[1]}")
+        print(f"Winner: Player {winner+1}")
+    return gs, history
+
+def _simulate_games(args: Tuple[int, float, Sequence[int]]) -> List[Tuple[int, List[int]]]:
+    """Worker: play one seeded game per seed and return (winner index, final scores) for each."""
+    target_score, bias_hit, seeds = args
+    # One GameState serves the whole batch, so per-game setup is only a reset
+    gs = GameState()
+    results = []
+    for seed in seeds:
+        play_game(target_score, bias_hit, seed=seed, gs=gs)
+        winner = 1 if gs.cumulative[0] < gs.cumulative[1] else 0
+        results.append((winner, gs.cumulative))
+    return results
+
+def run_games(n_games, target_score=100, bias_hit=0.9, seeds: Optional[Sequence[int]] = None, processes: Optional[int] = None):
+    """
+    Play many independent games, spread across worker processes.
+
+    Args:
+        n_games (int): Number of games to play.
+        target_score (int): Score threshold to end each game.
+        bias_hit (float): Probability of choosing 'Hit' over 'Stay' when both are available.
+        seeds (sequence of int): One seed per game, matching play_game(seed=...);
+            random seeds are drawn if omitted.
+        processes (int): Worker processes (defaults to the CPU count); 1 plays in-process.
+
+    Returns:
+        tuple: Win counts per player and the final [P1, P2] scores of every game.
+    """
+    if seeds is None:
+        seeds = [random.randrange(2**32) for _ in range(n_games)]
+    elif len(seeds) != n_games:
+        raise ValueError("Need exactly one seed per game")
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        results = _simulate_games((target_score, bias_hit, seeds))
+    else:
+        # A few batches per worker keeps them balanced while amortizing setup and IPC
+        batch = max(1, -(-n_games // (processes * 4)))
+        tasks = [(target_score, bias_hit, seeds[i:i + batch]) for i in range(0, n_games, batch)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = [r for chunk in pool.map(_simulate_games, tasks) for r in chunk]
+    wins = [0, 0]
+    for winner, _ in results:
+        wins[winner] += 1
+    return wins, [scores for _, scores in results]
 
 if __name__ == '__main__':
-    # Run simulation with default parameters
-    run_simulation()
+    # Run simulation with default parameters, printing every round
+    run_simulation(verbose=True)